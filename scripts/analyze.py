@@ -1,12 +1,39 @@
 import argparse
+import codecs
+import csv
+import functools
+import hashlib
 import json
+import math
+import os
+import re
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from datetime import date, datetime
+from typing import Optional
+from datetime import datetime
 
+import fastjsonschema
+import orjson
 import yaml
-import pandas as pd
-import matplotlib.pyplot as plt
-from jsonschema import validate, ValidationError
+import matplotlib
+
+# Headless rendering; must be selected before pyplot is imported
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+
+# Prefer libyaml's C loader; fall back to the pure-Python one if unavailable
+class Loader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """Safe YAML loader that keeps timestamps as ISO strings."""
+
+
+def construct_iso_timestamp(loader, node):
+    # Convert YAML date/datetime values into ISO strings while parsing
+    return loader.construct_yaml_timestamp(node).isoformat()
+
+
+Loader.add_constructor("tag:yaml.org,2002:timestamp", construct_iso_timestamp)
 
 # Adjust this schema to match your YAML format
 SCHEMA = {
@@ -21,7 +48,7 @@ SCHEMA = {
                 "date": {
                     "anyOf": [
                         {"type": "string"},  # "2026-01-15"
-                        {"type": "object"}   # PyYAML may parse into datetime.date
+                        {"type": "object"}   # arbitrary mapping (timestamps load as ISO strings)
                     ]
                 },
             },
@@ -32,23 +59,257 @@ SCHEMA = {
     "additionalProperties": True,
 }
 
-def normalize_dates(obj):
-    # Convert YAML-parsed date/datetime objects into ISO strings
-    if isinstance(obj, (date, datetime)):
-        return obj.isoformat()
-    if isinstance(obj, dict):
-        return {k: normalize_dates(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [normalize_dates(v) for v in obj]
-    return obj
+# One summary.csv row per valid file; the field names double as the CSV header
+Row = namedtuple("Row", "file name value tags date")
+
+# Upper bound on files handed to a worker process at a time, and how many
+# batches each worker should get so the pool stays balanced on small trees
+MAX_BATCH_SIZE = 64
+BATCHES_PER_WORKER = 4
+
+# Reader threads for the whole run, split evenly across the worker processes
+IO_THREADS = 16
+
+# Fixed figure margins (instead of tight_layout) with room for rotated x labels
+PLOT_MARGINS = {"bottom": 0.2, "left": 0.12}
+
+# Canonical form of SCHEMA, used as the validator cache key
+SCHEMA_JSON = json.dumps(SCHEMA, sort_keys=True)
+
+
+@functools.lru_cache(maxsize=32)
+def validator_for(schema_json: str):
+    # Compile each distinct schema once per process into a validation function
+    return fastjsonschema.compile(json.loads(schema_json))
+
+
+def validate_fast(data):
+    """Hand-written check equivalent to validating against SCHEMA.
+
+    Raises the same exception and messages as the compiled validator, checking
+    properties in the same (alphabetical, from SCHEMA_JSON) order.
+    Keep in sync with SCHEMA when the schema changes.
+    """
+    Invalid = fastjsonschema.JsonSchemaValueException
+
+    if not isinstance(data, dict):
+        raise Invalid("data must be object")
+    missing = [key for key in ("name", "value") if key not in data]
+    if missing:
+        raise Invalid(f"data must contain {missing} properties")
+
+    if "metadata" in data:
+        metadata = data["metadata"]
+        if not isinstance(metadata, dict):
+            raise Invalid("data.metadata must be object")
+        if "date" in metadata and not isinstance(metadata["date"], (str, dict)):
+            raise Invalid("data.metadata.date cannot be validated by any definition")
+
+    if not isinstance(data["name"], str):
+        raise Invalid("data.name must be string")
+
+    if "tags" in data:
+        tags = data["tags"]
+        if not isinstance(tags, list):
+            raise Invalid("data.tags must be array")
+        for i, tag in enumerate(tags):
+            if not isinstance(tag, str):
+                raise Invalid(f"data.tags[{i}] must be string")
+
+    value = data["value"]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise Invalid("data.value must be number")
+
+
+def find_yaml_files(root: str):
+    """Yield paths of all *.yml / *.yaml files below root in a single walk.
+
+    Unreadable directories are skipped, as Path.rglob does.
+    """
+    try:
+        it = os.scandir(root)
+    except PermissionError:
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from find_yaml_files(entry.path)
+            elif entry.name.endswith((".yml", ".yaml")):
+                yield entry.path
+
+
+# JSON that PyYAML's YAML 1.1 loader reads differently from orjson: exponents
+# (YAML 1.1 needs a dot and a signed exponent, else it is a string), integers
+# too large for orjson, \u surrogate escapes, and raw DEL, C1 controls (U+0080
+# to U+009F, NEL included) and U+FFFE/U+FFFF, which PyYAML's reader rejects
+YAML_ONLY_JSON = re.compile(
+    rb"[0-9][eE]|[0-9]{19}|\\u[dD][89abAB]|\x7f|\xc2[\x80-\x9f]|\xef\xbf[\xbe\xbf]"
+)
+
+
+def load_yaml_bytes(buf: bytes):
+    # JSON is valid YAML, and JSON-shaped files parse much faster with orjson.
+    # Documents where the two could disagree always go through the YAML loader.
+    if not YAML_ONLY_JSON.search(buf):
+        try:
+            return orjson.loads(buf)
+        except orjson.JSONDecodeError:
+            pass
+    return yaml.load(buf, Loader=Loader)
+
+
+def parse_and_validate(raw: bytes, fast_validate: bool = False):
+    """Parse and validate one document.
+
+    Returns (name, (name, value, tags, date), None) or (name, None, error message),
+    where name is the document's name if it parsed to a string (even when
+    validation fails), else None.
+    """
+    name = None
+    try:
+        data = load_yaml_bytes(raw)
+        if isinstance(data, dict) and isinstance(data.get("name"), str):
+            name = data["name"]
+
+        # Validate YAML structure
+        if fast_validate:
+            validate_fast(data)
+        else:
+            validator_for(SCHEMA_JSON)(data)
 
-def load_yaml_file(path: Path):
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        # One lookup per field; exact type checks are cheaper than isinstance
+        tags = data.get("tags")
+        metadata = data.get("metadata")
 
+        return name, (
+            data.get("name"),
+            data.get("value"),
+            ",".join(tags) if type(tags) is list else None,
+            metadata.get("date") if type(metadata) is dict else None,
+        ), None
 
+    except fastjsonschema.JsonSchemaValueException as e:
+        return name, None, f"Schema validation failed: {e.message}"
+    except Exception as e:
+        return name, None, str(e)
+
+
+# Results for files recently seen by this process, keyed by content digest,
+# so byte-identical copies are only parsed and validated once. Kept as a
+# bounded LRU so memory does not grow with the size of the tree.
+DIGEST_CACHE_SIZE = 4096
+_results_by_digest = OrderedDict()
+
+
+def read_file(path: str) -> bytes:
+    # Unbuffered: readall() sizes the buffer from fstat and reads it in one go
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            # Hint the kernel to read ahead; files are read front to back
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f.read()
+
+
+# Characters YAML may fold, quote or escape inside a scalar; a name prefix
+# containing any of them cannot be found reliably in a file's raw bytes
+UNSAFE_PRESCAN_CHARS = re.compile(r"[\s'\"\\]")
+
+
+def prescan_needle(name_prefix: Optional[str]) -> Optional[bytes]:
+    """Bytes to prescan files for, or None if name_prefix cannot be prescanned safely."""
+    if name_prefix is None or UNSAFE_PRESCAN_CHARS.search(name_prefix):
+        return None
+    try:
+        return name_prefix.encode("utf-8")
+    except UnicodeEncodeError:
+        # Undecodable argv bytes (surrogate escapes); fall back to a full parse
+        return None
+
+
+def may_contain(raw: bytes, needle: bytes) -> bool:
+    """Cheap prescan: False only if the document cannot have a name starting with needle.
+
+    needle must come from prescan_needle(), so it has no whitespace, quotes
+    or backslashes that YAML could fold or escape. Documents with backslash
+    escapes and UTF-16 files are not searched byte-wise, so they always go
+    on to a full parse.
+    """
+    return needle in raw or b"\\" in raw or raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE))
+
+
+def process_file(p: str, raw: bytes, fast_validate: bool = False):
+    """Validate one YAML file's contents; return (name, row, None) or (name, None, error).
+
+    name is the parsed document name, or None if it could not be determined.
+    """
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    result = _results_by_digest.get(digest)
+    if result is None:
+        result = _results_by_digest[digest] = parse_and_validate(raw, fast_validate)
+        if len(_results_by_digest) > DIGEST_CACHE_SIZE:
+            _results_by_digest.popitem(last=False)
+    else:
+        _results_by_digest.move_to_end(digest)
+
+    name, fields, error = result
+    if fields is None:
+        return name, None, {"file": p, "error": error}
+    return name, Row(p, *fields), None
+
+
+def worker_count() -> int:
+    # CPUs this process may run on (respects taskset / cgroup CPU affinity)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def process_batch(
+    paths: list, fast_validate: bool = False, name_prefix: Optional[str] = None, io_threads: int = 1
+):
+    """Process a batch of files in order; return a list of (row, error) pairs.
+
+    The whole batch is read on I/O threads up front, so reading the next
+    files overlaps with parsing the current one. With name_prefix, rows and
+    errors of files whose name does not match are dropped, and files that
+    cannot match are dropped before they are parsed (and so are not
+    validated either).
+    """
+    needle = prescan_needle(name_prefix)
+    results = []
+    with ThreadPoolExecutor(max_workers=io_threads) as pool:
+        reads = [pool.submit(read_file, p) for p in paths]
+        for p, read in zip(paths, reads):
+            try:
+                raw = read.result()
+            except OSError as e:
+                results.append((None, {"file": p, "error": str(e)}))
+                continue
+            if needle is not None and not may_contain(raw, needle):
+                continue
+            name, row, error = process_file(p, raw, fast_validate)
+            # Valid or not, a file whose name is known and does not match is
+            # filtered out; files without a usable name are still reported
+            if name_prefix is not None and name is not None and not name.startswith(name_prefix):
+                continue
+            results.append((row, error))
+    return results
+
+
+def is_finite_number(value) -> bool:
+    """True for values usable in the summary stats: not NaN, ±inf or beyond float range."""
+    try:
+        return math.isfinite(value)
+    except (TypeError, OverflowError):
+        return False
+
+
+@functools.lru_cache(maxsize=4096)
 def safe_parse_date(date_str: str):
-    """Parse YYYY-MM-DD into datetime.date; return None if invalid."""
+    """Parse YYYY-MM-DD into datetime.date; return None if invalid.
+
+    Cached, since many files usually share the same date.
+    """
     if not date_str or not isinstance(date_str, str):
         return None
     try:
@@ -57,56 +318,79 @@ def safe_parse_date(date_str: str):
         return None
 
 
-def make_plots(df: pd.DataFrame, out_plots: Path):
+def make_plots(points: list, out_plots: Path):
+    """Plot (name, value, date) tuples collected from the valid files."""
     out_plots.mkdir(parents=True, exist_ok=True)
 
+    # One figure is reused for every plot; each plot starts from a cleared Axes
+    fig, ax = plt.subplots()
+    fig.subplots_adjust(**PLOT_MARGINS)
+
     # 1) Histogram of values
-    if "value" in df.columns and df["value"].notna().any():
-        plt.figure()
-        plt.hist(df["value"].dropna(), bins=20)
-        plt.title("Distribution of value")
-        plt.xlabel("value")
-        plt.ylabel("count")
-        plt.tight_layout()
-        plt.savefig(out_plots / "value_hist.png", dpi=150)
-        plt.close()
+    values = [value for _, value, _ in points if value is not None]
+    if values:
+        ax.clear()
+        ax.hist(values, bins=20)
+        ax.set_title("Distribution of value")
+        ax.set_xlabel("value")
+        ax.set_ylabel("count")
+        fig.savefig(out_plots / "value_hist.png", dpi=150)
 
     # 2) Mean value by name (bar)
-    if "name" in df.columns and df["name"].notna().any():
-        grp = df.dropna(subset=["name", "value"]).groupby("name", as_index=True)["value"].mean().sort_values()
-        if len(grp) > 0:
-            plt.figure()
-            plt.bar(grp.index.astype(str), grp.values)
-            plt.title("Mean value by name")
-            plt.xlabel("name")
-            plt.ylabel("mean(value)")
-            plt.xticks(rotation=30, ha="right")
-            plt.tight_layout()
-            plt.savefig(out_plots / "value_by_name.png", dpi=150)
-            plt.close()
+    totals = {}
+    for name, value, _ in points:
+        if name is not None and value is not None:
+            s, n = totals.get(name, (0.0, 0))
+            totals[name] = (s + value, n + 1)
+    if totals:
+        grp = sorted(((name, s / n) for name, (s, n) in totals.items()), key=lambda kv: kv[1])
+        ax.clear()
+        ax.bar([str(name) for name, _ in grp], [mean for _, mean in grp])
+        ax.set_title("Mean value by name")
+        ax.set_xlabel("name")
+        ax.set_ylabel("mean(value)")
+        plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
+        fig.savefig(out_plots / "value_by_name.png", dpi=150)
 
     # 3) Value vs date (line), if metadata.date exists
-    if "date" in df.columns and df["date"].notna().any():
-        df_date = df.dropna(subset=["date", "value"]).copy()
-        df_date["date_parsed"] = df_date["date"].apply(safe_parse_date)
-        df_date = df_date.dropna(subset=["date_parsed"]).sort_values("date_parsed")
-
-        if not df_date.empty:
-            plt.figure()
-            plt.plot(df_date["date_parsed"], df_date["value"])
-            plt.title("Value over time")
-            plt.xlabel("date")
-            plt.ylabel("value")
-            plt.xticks(rotation=30, ha="right")
-            plt.tight_layout()
-            plt.savefig(out_plots / "value_by_date.png", dpi=150)
-            plt.close()
+    dated = []
+    for _, value, date_str in points:
+        if isinstance(date_str, str) and value is not None:
+            parsed = safe_parse_date(date_str)
+            if parsed is not None:
+                dated.append((parsed, value))
+    dated.sort(key=lambda dv: dv[0])
+
+    if dated:
+        ax.clear()
+        ax.plot([d for d, _ in dated], [v for _, v in dated])
+        ax.set_title("Value over time")
+        ax.set_xlabel("date")
+        ax.set_ylabel("value")
+        plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
+        fig.savefig(out_plots / "value_by_date.png", dpi=150)
+
+    plt.close(fig)
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", required=True, help="Input folder with YAML files")
     parser.add_argument("--output", required=True, help="Output folder for reports")
+    parser.add_argument(
+        "--fast-validate",
+        action="store_true",
+        help="Use the hand-written validator for the built-in SCHEMA instead of the compiled one",
+    )
+    parser.add_argument(
+        "--filter-name",
+        metavar="PREFIX",
+        help=(
+            "Only report files (valid or invalid) whose name starts with PREFIX. "
+            "Files with no readable name are reported too, except that files "
+            "never mentioning PREFIX may be skipped unparsed and unvalidated"
+        ),
+    )
     args = parser.parse_args()
 
     input_dir = Path(args.input)
@@ -114,48 +398,68 @@ def main():
     plots_dir = out_dir / "plots"
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    rows = []
+    points = []  # (name, value, date) per valid file, for the plots
     errors = []
 
-    yaml_files = sorted(list(input_dir.rglob("*.yml")) + list(input_dir.rglob("*.yaml")))
+    # Sort by path components, matching the order of sorted Path objects
+    yaml_files = []
+    if input_dir.is_dir():
+        yaml_files = sorted(find_yaml_files(str(input_dir)), key=lambda p: p.split(os.sep))
     if not yaml_files:
         raise SystemExit(f"No YAML files found in: {input_dir}")
 
-    for p in yaml_files:
-        try:
-            data = load_yaml_file(p)
-            data = normalize_dates(data)
-
-            # Validate YAML structure
-            validate(instance=data, schema=SCHEMA)
-
-            metadata = data.get("metadata") if isinstance(data.get("metadata"), dict) else {}
+    # Running aggregates for the summary, so rows never need to be kept around
+    value_count = 0
+    value_sum = 0.0
+    value_min = math.inf
+    value_max = -math.inf
 
-            rows.append({
-                "file": str(p),
-                "name": data.get("name"),
-                "value": data.get("value"),
-                "tags": ",".join(data.get("tags", [])) if isinstance(data.get("tags"), list) else None,
-                "date": metadata.get("date"),
-            })
+    # Parse and validate batches of files in parallel; map() keeps the input
+    # order. Rows are streamed straight into the CSV as they come back.
+    workers = worker_count()
+    batch_size = max(1, min(MAX_BATCH_SIZE, math.ceil(len(yaml_files) / (workers * BATCHES_PER_WORKER))))
+    io_threads = max(1, min(batch_size, IO_THREADS // workers))
+    batches = [yaml_files[i:i + batch_size] for i in range(0, len(yaml_files), batch_size)]
+    with (out_dir / "summary.csv").open("w", encoding="utf-8", newline="") as f, \
+            ProcessPoolExecutor(max_workers=workers) as ex:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(Row._fields)
 
-        except ValidationError as e:
-            errors.append({"file": str(p), "error": f"Schema validation failed: {e.message}"})
-        except Exception as e:
-            errors.append({"file": str(p), "error": str(e)})
+        process = functools.partial(
+            process_batch,
+            fast_validate=args.fast_validate,
+            name_prefix=args.filter_name,
+            io_threads=io_threads,
+        )
+        for results in ex.map(process, batches):
+            for row, error in results:
+                if row is None:
+                    errors.append(error)
+                    continue
 
-    df = pd.DataFrame(rows)
+                value = row.value
+                # Non-finite values are left out of the stats and plots;
+                # NaN is a missing value and is written as an empty CSV cell
+                if is_finite_number(value):
+                    value_count += 1
+                    value_sum += value
+                    value_min = min(value_min, value)
+                    value_max = max(value_max, value)
+                else:
+                    if isinstance(value, float) and math.isnan(value):
+                        row = row._replace(value=None)
+                    value = None
 
-    # Save tabular outputs
-    df.to_csv(out_dir / "summary.csv", index=False)
+                writer.writerow(row)
+                points.append((row.name, value, row.date))
 
     summary = {
-        "files_ok": len(rows),
+        "files_ok": len(points),
         "files_failed": len(errors),
-        "value_count": int(df["value"].count()) if not df.empty else 0,
-        "value_mean": float(df["value"].mean()) if not df.empty else None,
-        "value_min": float(df["value"].min()) if not df.empty else None,
-        "value_max": float(df["value"].max()) if not df.empty else None,
+        "value_count": value_count,
+        "value_mean": value_sum / value_count if value_count else None,
+        "value_min": float(value_min) if value_count else None,
+        "value_max": float(value_max) if value_count else None,
         "plots": [
             "plots/value_hist.png",
             "plots/value_by_name.png",
@@ -163,11 +467,11 @@ def main():
         ],
         "errors": errors,
     }
-    (out_dir / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    (out_dir / "summary.json").write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
 
     # Generate plots (even if some files failed, you still get plots for the valid rows)
-    if not df.empty:
-        make_plots(df, plots_dir)
+    if points:
+        make_plots(points, plots_dir)
 
     # Fail CI if there were invalid files
     if errors: